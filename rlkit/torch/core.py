@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 import numpy as np
 import torch
 
@@ -56,3 +58,39 @@ def np_to_pytorch_batch(np_batch):
         for k, x in _filter_batch(np_batch)
         if x.dtype != np.dtype("O")  # ignore object (e.g. dictionaries)
     }
+
+
+def create_stats_ordered_dict_from_torch(stats):
+    """
+    Same statistics as `create_stats_ordered_dict`, but reduced on the
+    device and copied to the host with a single transfer.
+
+    :param stats: OrderedDict mapping names to tensors. 0-d tensors are
+    logged as is, others are summarized with mean/std/max/min. None values
+    are logged as NaN.
+    """
+    ordered_dict = OrderedDict()
+    names = []
+    values = []
+    for name, data in stats.items():
+        if data is None:
+            ordered_dict[name] = np.nan
+            continue
+        data = data.float()
+        if data.dim() == 0:
+            entries = [(name, data)]
+        else:
+            entries = [
+                (name + " Mean", data.mean()),
+                (name + " Std", data.std(unbiased=False)),
+                (name + " Max", data.max()),
+                (name + " Min", data.min()),
+            ]
+        for key, value in entries:
+            ordered_dict[key] = None
+            names.append(key)
+            values.append(value)
+    if values:
+        for key, value in zip(names, ptu.get_numpy(torch.stack(values))):
+            ordered_dict[key] = value
+    return ordered_dict
@@ -31,5 +31,9 @@ class HERTrainer(TorchTrainer):
     def networks(self, nets):
         self._base_trainer.networks = nets
 
+    @property
+    def target_networks(self):
+        return self._base_trainer.target_networks
+
     def get_snapshot(self):
         return self._base_trainer.get_snapshot()
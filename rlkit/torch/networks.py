@@ -94,6 +94,157 @@ class FlattenMlp(Mlp):
         return super().forward(flat_inputs, **kwargs)
 
 
+class _StackedParams(torch.autograd.Function):
+    """
+    Return the stacked storage of two parameters as a differentiable function
+    of them. The storage already holds their values, so nothing is copied;
+    the gradient is split back between them.
+    """
+
+    @staticmethod
+    def forward(ctx, stacked, param1, param2):
+        return stacked.view_as(stacked)
+
+    @staticmethod
+    def backward(ctx, grad):
+        return None, grad[0], grad[1]
+
+
+def _module_config(module):
+    """
+    Attributes that are neither parameters, buffers nor submodules, e.g. the
+    activations of an `Mlp`.
+    """
+    config = {}
+    for name, value in vars(module).items():
+        if name.startswith("_") or name == "training":
+            continue
+        if isinstance(value, (nn.Module, torch.Tensor)):
+            continue
+        # e.g. Mlp.fcs, whose entries are compared as submodules.
+        if isinstance(value, (list, tuple)) and any(
+            isinstance(v, nn.Module) for v in value
+        ):
+            continue
+        config[name] = value
+    return config
+
+
+class TwinQ(nn.Module):
+    """
+    Evaluate two critics of identical architecture in one batched call.
+
+    The parameters stay owned by `qf1` and `qf2`, so their optimizers and
+    snapshots are unchanged. Their storage is moved into one tensor per
+    parameter name, stacked along a new leading dimension, and the forward
+    pass is vectorized over that dimension without copying any weights.
+
+    Anything that gives the parameters new storage (`qf1.to(device)`,
+    `qf1.double()`, `load_state_dict(..., assign=True)`, ...) unlinks them
+    from the stack, so the TwinQ has to be created again afterwards. Use
+    `shares_storage` to check for this.
+
+    ```
+    twin_q = TwinQ(qf1, qf2)
+    q1, q2 = twin_q(obs, actions)
+    ```
+    """
+
+    def __init__(self, qf1, qf2):
+        super().__init__()
+        assert TwinQ.can_stack(qf1, qf2)
+        self.qf1 = qf1
+        self.qf2 = qf2
+        self._stacked = {}
+        for (name, p1), (_, p2) in zip(
+            qf1.named_parameters(), qf2.named_parameters()
+        ):
+            stacked = torch.stack([p1.detach(), p2.detach()])
+            p1.data = stacked[0]
+            p2.data = stacked[1]
+            self._stacked[name] = stacked
+        self._data_ptrs = self._param_data_ptrs()
+
+    def shares_storage(self):
+        """
+        Whether the parameters of `qf1` and `qf2` are still views into the
+        stacked storage that the forward pass reads.
+        """
+        return self._param_data_ptrs() == self._data_ptrs
+
+    def _param_data_ptrs(self):
+        return [
+            (p1.data_ptr(), p2.data_ptr())
+            for p1, p2 in zip(self.qf1.parameters(), self.qf2.parameters())
+        ]
+
+    @staticmethod
+    def can_stack(qf1, qf2):
+        if type(qf1) is not type(qf2):
+            return False
+        if list(qf1.buffers()) or list(qf2.buffers()):
+            return False
+        params1 = [(name, p.shape, p.dtype, p.device)
+                   for name, p in qf1.named_parameters()]
+        params2 = [(name, p.shape, p.dtype, p.device)
+                   for name, p in qf2.named_parameters()]
+        if params1 != params2:
+            return False
+        # Both critics are evaluated with the code of qf1, so everything else
+        # that affects the forward pass (activations, layer norm, ...) has to
+        # match as well.
+        modules1 = list(qf1.named_modules())
+        modules2 = list(qf2.named_modules())
+        if len(modules1) != len(modules2):
+            return False
+        for (name1, m1), (name2, m2) in zip(modules1, modules2):
+            if name1 != name2 or type(m1) is not type(m2):
+                return False
+            try:
+                if _module_config(m1) != _module_config(m2):
+                    return False
+            except (TypeError, ValueError, RuntimeError):
+                # Not comparable, e.g. numpy arrays.
+                return False
+        return True
+
+    def forward(self, *inputs, detach_params=False):
+        """
+        :param detach_params: If True, gradients only flow into `inputs`.
+        """
+        if detach_params:
+            params = {name: p.detach() for name, p in self._stacked.items()}
+        else:
+            params = {
+                name: _StackedParams.apply(self._stacked[name], p1, p2)
+                for (name, p1), (_, p2) in zip(
+                    self.qf1.named_parameters(), self.qf2.named_parameters()
+                )
+            }
+
+        def q_value(stacked_params):
+            return torch.func.functional_call(self.qf1, stacked_params, inputs)
+
+        q1, q2 = torch.func.vmap(q_value)(params)
+        return q1, q2
+
+    def forward_detached_and_live(self, obs, policy_actions, actions):
+        """
+        Evaluate both critics on `(obs, policy_actions)` with detached
+        parameters and on `(obs, actions)` with their parameters.
+
+        This is what an actor-critic update needs: gradients of the first
+        pair flow into `policy_actions` (e.g. for a policy loss) but not into
+        the critics, the second pair trains the critics.
+
+        :return: (q1, q2) for policy_actions, (q1, q2) for actions
+        """
+        return (
+            self(obs, policy_actions, detach_params=True),
+            self(obs, actions),
+        )
+
+
 class MlpPolicy(Mlp, Policy):
     """
     A simpler interface for creating policies.
@@ -5,8 +5,13 @@ import torch.distributed as dist
 
 
 def soft_update_from_to(source, target, tau):
-    for target_param, param in zip(target.parameters(), source.parameters()):
-        target_param.data.copy_(target_param.data * (1.0 - tau) + param.data * tau)
+    soft_update_params(list(source.parameters()), list(target.parameters()), tau)
+
+
+def soft_update_params(source_params, target_params, tau):
+    # target + tau * (source - target), for all parameters in one kernel.
+    with torch.no_grad():
+        torch._foreach_lerp_(target_params, source_params, tau)
 
 
 def copy_model_params_from_to(source, target):
@@ -84,6 +89,26 @@ def from_numpy(*args, **kwargs):
     return torch.from_numpy(*args, **kwargs).float().to(device)
 
 
+def from_numpy_concat_non_blocking(np_arrays):
+    """
+    Concatenate 2D arrays along dim 1 into one float32 tensor on the device.
+
+    Each array is converted while it is copied into a pinned host buffer, so
+    the data is copied once on the host and the copy to the device is
+    asynchronous.
+    """
+    width = sum(np_array.shape[1] for np_array in np_arrays)
+    pinned = torch.empty(
+        (np_arrays[0].shape[0], width), dtype=torch.float32, pin_memory=True
+    )
+    start = 0
+    for np_array in np_arrays:
+        end = start + np_array.shape[1]
+        pinned[:, start:end].copy_(torch.from_numpy(np_array))
+        start = end
+    return pinned.to(device, non_blocking=True)
+
+
 def get_numpy(tensor):
     return tensor.to("cpu").detach().numpy()
 
@@ -141,3 +166,12 @@ def average_tensor(tensor):
         dist_group = dist.new_group(range(dist.get_world_size()))
     dist.all_reduce(tensor, op=dist.ReduceOp.SUM, group=dist_group)
     return tensor / float(dist_group.size())
+
+
+def broadcast_module(module, src=0):
+    """
+    Make the parameters and buffers of `module` identical on all processes.
+    """
+    with torch.no_grad():
+        for tensor in module.state_dict().values():
+            dist.broadcast(tensor, src)
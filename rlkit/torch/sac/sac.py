@@ -1,3 +1,4 @@
+import inspect
 from collections import OrderedDict
 
 import numpy as np
@@ -5,11 +6,44 @@ import numpy as np
 import rlkit.torch.pytorch_util as ptu
 import torch
 import torch.optim as optim
-from rlkit.core.eval_util import create_stats_ordered_dict
+from rlkit.torch.core import create_stats_ordered_dict_from_torch
+from rlkit.torch.networks import TwinQ
 from rlkit.torch.torch_rl_algorithm import TorchTrainer
 from torch import nn as nn
 
 
+CUDA_GRAPH_WARMUP_STEPS = 3
+BATCH_KEYS = (
+    "observations",
+    "actions",
+    "rewards",
+    "terminals",
+    "next_observations",
+)
+
+
+def _split_batch(output):
+    """
+    Undo the concatenation of two equally sized batches along dim 0.
+    Non-batched outputs (e.g. a fixed log_std) are shared by both halves.
+    """
+    if torch.is_tensor(output) and output.dim() > 0:
+        return torch.chunk(output, 2, dim=0)
+    return output, output
+
+
+def _call_with_detached_params(module, *inputs):
+    """
+    Evaluate `module` such that gradients flow into `inputs` but not into
+    the parameters of `module`.
+    """
+    # Call the wrapped module directly, so that DistributedDataParallel only
+    # sees the forward whose gradients it has to reduce.
+    module = getattr(module, "module", module)
+    params = {name: param.detach() for name, param in module.named_parameters()}
+    return torch.func.functional_call(module, params, inputs)
+
+
 class SACTrainer(TorchTrainer):
     def __init__(
         self,
@@ -33,6 +67,11 @@ class SACTrainer(TorchTrainer):
         policy_optimizer=None,
         qf1_optimizer=None,
         qf2_optimizer=None,
+        use_torch_compile=False,
+        use_twin_q=True,
+        use_bf16=False,
+        use_cuda_graph=False,
+        allow_tf32=False,
     ):
         super().__init__()
         self.env = env
@@ -41,161 +80,498 @@ class SACTrainer(TorchTrainer):
         self.qf2 = qf2
         self.target_qf1 = target_qf1
         self.target_qf2 = target_qf2
+        self.use_twin_q = use_twin_q
+        self._build_twin_qs()
+        self._cache_target_update_params()
         self.soft_target_tau = soft_target_tau
         self.target_update_period = target_update_period
 
-        self.alpha = torch.tensor(alpha)
+        # Use the multi-tensor optimizer kernels when they are available, so
+        # that all parameters of a network are updated in a few launches.
+        optimizer_kwargs = {}
+        if "fused" in inspect.signature(optimizer_class).parameters:
+            if ptu.gpu_enabled():
+                optimizer_kwargs["fused"] = True
+            else:
+                optimizer_kwargs["foreach"] = True
+            # Keep the step count on the device so the update can be captured.
+            if use_cuda_graph:
+                optimizer_kwargs["capturable"] = True
+
+        # Used as is when the entropy is not tuned; kept on the device so that
+        # the entropy terms do not mix devices or dtypes.
+        self.alpha = ptu.tensor(alpha, dtype=torch.float32)
         self.use_automatic_entropy_tuning = use_automatic_entropy_tuning
         if self.use_automatic_entropy_tuning:
-            if target_entropy:
-                self.target_entropy = target_entropy
-            else:
+            if not target_entropy:
                 # heuristic value from Tuomas
-                self.target_entropy = -np.prod(self.env.action_space.shape).item()
+                target_entropy = -np.prod(self.env.action_space.shape).item()
+            self.target_entropy = ptu.tensor(target_entropy, dtype=torch.float32)
             self.log_alpha = ptu.zeros(1, requires_grad=True)
-            self.alpha_optimizer = optimizer_class([self.log_alpha], lr=policy_lr)
+            self.alpha_optimizer = optimizer_class(
+                [self.log_alpha], lr=policy_lr, **optimizer_kwargs
+            )
 
         self.render_eval_paths = render_eval_paths
 
         self.qf_criterion = nn.MSELoss()
 
         if policy_optimizer is None:
-            self.policy_optimizer = optimizer_class(
-                self.policy.parameters(), lr=policy_lr,
+            policy_optimizer = optimizer_class(
+                self.policy.parameters(), lr=policy_lr, **optimizer_kwargs
             )
         if qf1_optimizer is None:
-            self.qf1_optimizer = optimizer_class(self.qf1.parameters(), lr=qf_lr,)
+            qf1_optimizer = optimizer_class(
+                self.qf1.parameters(), lr=qf_lr, **optimizer_kwargs
+            )
         if qf2_optimizer is None:
-            self.qf2_optimizer = optimizer_class(self.qf2.parameters(), lr=qf_lr,)
+            qf2_optimizer = optimizer_class(
+                self.qf2.parameters(), lr=qf_lr, **optimizer_kwargs
+            )
+        self.policy_optimizer = policy_optimizer
+        self.qf1_optimizer = qf1_optimizer
+        self.qf2_optimizer = qf2_optimizer
 
         self.discount = discount
         self.reward_scale = reward_scale
         self.eval_statistics = OrderedDict()
+        self._pending_stats = {}
         self._n_train_steps_total = 0
         self._need_to_update_eval_statistics = True
 
+        # Host to device copies of the batch run on their own stream, so they
+        # overlap with the work still queued from the previous step.
+        if ptu.gpu_enabled():
+            self._copy_stream = torch.cuda.Stream(device=ptu.device)
+        else:
+            self._copy_stream = None
+        self._batch_slices = None
+        if ptu.gpu_enabled():
+            self._target_update_stream = torch.cuda.Stream(device=ptu.device)
+        else:
+            self._target_update_stream = None
+
+        # Opt-in TF32 tensor cores for float32 matmuls/convolutions on Ampere
+        # and newer. This trades precision for speed and is a process-wide
+        # setting. With use_bf16 the network forwards run in bfloat16 instead
+        # and are not affected by it.
+        if allow_tf32 and ptu.gpu_enabled():
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.allow_tf32 = True
+
+        self.use_bf16 = use_bf16
+        self.use_torch_compile = use_torch_compile
+        self.use_cuda_graph = use_cuda_graph
+        assert not (use_cuda_graph and use_torch_compile), (
+            "torch.compile with mode='reduce-overhead' already uses CUDA graphs"
+        )
+        if self.use_cuda_graph:
+            assert ptu.gpu_enabled(), "CUDA graphs require the GPU to be enabled"
+        self._batch_size = None
+        self._static_batch = None
+        self._static_outputs = None
+        self._cuda_graph = None
+        self._n_cuda_graph_warmup_steps = 0
+        if self.use_torch_compile:
+            # The alpha step runs eagerly between the two compiled parts, so
+            # the losses always see the updated alpha.
+            self._policy_forward = torch.compile(
+                self._policy_forward, mode="reduce-overhead", dynamic=False,
+            )
+            self._compute_losses = torch.compile(
+                self._compute_losses, mode="reduce-overhead", dynamic=False,
+            )
+
+    def train(self, np_batch):
+        if self._copy_stream is None:
+            return super().train(np_batch)
+        self._num_train_steps += 1
+        # All fields are packed into one (batch_size, total_width) tensor so
+        # that they reach the device with a single copy.
+        if self._batch_slices is None:
+            self._batch_slices = OrderedDict()
+            start = 0
+            for key in BATCH_KEYS:
+                width = np_batch[key].shape[1]
+                self._batch_slices[key] = slice(start, start + width)
+                start += width
+        for key, batch_slice in self._batch_slices.items():
+            assert np_batch[key].shape[1] == batch_slice.stop - batch_slice.start, (
+                "The width of {} changed between batches".format(key)
+            )
+        with torch.cuda.stream(self._copy_stream):
+            flat_batch = ptu.from_numpy_concat_non_blocking(
+                [np_batch[key] for key in BATCH_KEYS]
+            )
+        compute_stream = torch.cuda.current_stream()
+        compute_stream.wait_stream(self._copy_stream)
+        # Allocated on the copy stream but consumed on the compute stream.
+        flat_batch.record_stream(compute_stream)
+        torch_batch = {
+            key: flat_batch[:, batch_slice]
+            for key, batch_slice in self._batch_slices.items()
+        }
+        self.train_from_torch(torch_batch)
+
     def train_from_torch(self, batch):
+        if any(
+            twin_q is not None and not twin_q.shares_storage()
+            for twin_q in (self.twin_q, self.target_twin_q)
+        ):
+            # The critics got new parameter storage (e.g. `qf1.double()`)
+            # without going through the `networks` setter.
+            self._build_twin_qs()
+            self._cache_target_update_params()
+        if self.use_torch_compile or self.use_cuda_graph:
+            # Shapes must not change, otherwise the compiled graph is rebuilt.
+            if self._batch_size is None:
+                self._batch_size = batch["observations"].shape[0]
+            assert batch["observations"].shape[0] == self._batch_size
+            # Compiled and captured updates cannot wait on another stream
+            # midway, see `_compute_losses`.
+            self._wait_for_target_update()
+        if self.use_cuda_graph:
+            outputs = self._update_with_cuda_graph(batch)
+        else:
+            outputs = self._update(batch)
+        """
+        Soft Updates
+        """
+        if self._n_train_steps_total % self.target_update_period == 0:
+            self._update_target_networks()
+        """
+        Save some statistics for eval
+        """
+        if self._need_to_update_eval_statistics:
+            self._need_to_update_eval_statistics = False
+            """
+            Eval should set this to None.
+            This way, these statistics are only computed for one batch.
+
+            The tensors are only detached here so that logging does not
+            force a device sync every step. They are copied to the host in
+            `get_diagnostics`. They are cloned since CUDA graphs reuse their
+            output buffers on the next step.
+            """
+            (
+                qf1_loss,
+                qf2_loss,
+                norm_qf1,
+                norm_qf2,
+                norm_policy,
+                q1_pred,
+                q2_pred,
+                q_target,
+                log_pi,
+                q_new_actions,
+                policy_mean,
+                policy_log_std,
+                alpha,
+                alpha_loss,
+            ) = outputs
+            self._pending_stats = OrderedDict(
+                (name, None if value is None else value.detach().clone())
+                for name, value in [
+                    ("QF1 Loss", qf1_loss),
+                    ("QF2 Loss", qf2_loss),
+                    ("Policy Loss", (log_pi - q_new_actions).mean()),
+                    ("QF1 Grad Norm", norm_qf1),
+                    ("QF2 Grad Norm", norm_qf2),
+                    ("Policy Grad Norm", norm_policy),
+                    ("Q1 Predictions", q1_pred),
+                    ("Q2 Predictions", q2_pred),
+                    ("Q Targets", q_target),
+                    ("Log Pis", log_pi),
+                    ("Policy mu", policy_mean),
+                    ("Policy log std", policy_log_std),
+                    ("Alpha", alpha.squeeze()),
+                    ("Alpha Loss", alpha_loss),
+                ]
+            )
+        self._n_train_steps_total += 1
+
+    def _update(self, batch):
+        """
+        Take one gradient step on the policy, critics and alpha.
+
+        Does not sync with the device, so it can be captured in a CUDA graph.
+        Returns the detached tensors that the statistics are computed from,
+        see `train_from_torch`.
+        """
         rewards = batch["rewards"]
         terminals = batch["terminals"]
         obs = batch["observations"]
         actions = batch["actions"]
         next_obs = batch["next_observations"]
+        (
+            new_obs_actions,
+            new_next_actions,
+            log_pi,
+            new_log_pi,
+            policy_mean,
+            policy_log_std,
+        ) = self._policy_forward(obs, next_obs)
         """
-        Policy and Alpha Loss
+        Alpha Loss
         """
-        new_obs_actions, policy_mean, policy_log_std, log_pi, *_ = self.policy(
-            obs, reparameterize=True, return_log_prob=True,
-        )
         if self.use_automatic_entropy_tuning:
-            alpha_loss = -(
-                self.log_alpha * (log_pi + self.target_entropy).detach()
-            ).mean()
-            self.alpha_optimizer.zero_grad()
+            log_pi_mean = log_pi.detach().mean()
+            if ptu.distributed:
+                # log_alpha is not wrapped in DistributedDataParallel, so
+                # average its input to keep the copies of all processes equal.
+                log_pi_mean = ptu.average_tensor(log_pi_mean)
+            # Same as -(log_alpha * (log_pi + target_entropy)).mean(), without
+            # a batch-sized temporary.
+            alpha_loss = -self.log_alpha.squeeze() * (
+                log_pi_mean + self.target_entropy
+            )
+            self.alpha_optimizer.zero_grad(set_to_none=True)
             alpha_loss.backward()
             self.alpha_optimizer.step()
-            alpha = self.log_alpha.exp()
+            alpha = self.log_alpha.exp().detach()
         else:
-            alpha_loss = 0
+            alpha_loss = None
             alpha = self.alpha
 
-        q_new_actions = torch.min(
-            self.qf1(obs, new_obs_actions), self.qf2(obs, new_obs_actions),
+        (
+            policy_loss,
+            qf1_loss,
+            qf2_loss,
+            q1_pred,
+            q2_pred,
+            q_target,
+            q_new_actions,
+        ) = self._compute_losses(
+            obs,
+            actions,
+            rewards,
+            terminals,
+            next_obs,
+            new_obs_actions,
+            new_next_actions,
+            log_pi,
+            new_log_pi,
+            alpha,
         )
-        policy_loss = (alpha * log_pi - q_new_actions).mean()
         """
-        QF Loss
+        Update networks
         """
-        q1_pred = self.qf1(obs, actions)
-        q2_pred = self.qf2(obs, actions)
-        # Make sure policy accounts for squashing functions like tanh correctly!
-        new_next_actions, _, _, new_log_pi, *_ = self.policy(
-            next_obs, reparameterize=True, return_log_prob=True,
-        )
-        target_q_values = (
-            torch.min(
-                self.target_qf1(next_obs, new_next_actions),
-                self.target_qf2(next_obs, new_next_actions),
-            )
-            - alpha * new_log_pi
+        # The losses touch disjoint parameters (see `_compute_losses`), so a
+        # single backward pass over their sum gives the same gradients as
+        # separate passes.
+        for optimizer in (
+            self.policy_optimizer,
+            self.qf1_optimizer,
+            self.qf2_optimizer,
+        ):
+            optimizer.zero_grad(set_to_none=True)
+        (policy_loss + qf1_loss + qf2_loss).backward()
+        norm_policy = nn.utils.clip_grad_norm_(
+            self.policy.parameters(), 100, foreach=True
         )
+        norm_qf1 = nn.utils.clip_grad_norm_(self.qf1.parameters(), 100, foreach=True)
+        norm_qf2 = nn.utils.clip_grad_norm_(self.qf2.parameters(), 100, foreach=True)
+        self.policy_optimizer.step()
+        self.qf1_optimizer.step()
+        self.qf2_optimizer.step()
 
-        q_target = (
-            self.reward_scale * rewards
-            + (1.0 - terminals) * self.discount * target_q_values
+        return (
+            qf1_loss.detach(),
+            qf2_loss.detach(),
+            norm_qf1,
+            norm_qf2,
+            norm_policy,
+            q1_pred.detach(),
+            q2_pred.detach(),
+            q_target.detach(),
+            log_pi.detach(),
+            q_new_actions.detach(),
+            policy_mean.detach(),
+            policy_log_std.detach(),
+            alpha,
+            None if alpha_loss is None else alpha_loss.detach(),
         )
-        qf1_loss = self.qf_criterion(q1_pred, q_target.detach())
-        qf2_loss = self.qf_criterion(q2_pred, q_target.detach())
+
+    def _update_target_networks(self):
         """
-        Update networks
+        Soft update the target critics. On the GPU this runs on a side
+        stream: the targets are only read by the next step's TD target, so
+        the update overlaps with that step's policy forward.
         """
-        self.policy_optimizer.zero_grad()
-        policy_loss.backward()
-        norm_policy = nn.utils.clip_grad_norm_(self.policy.parameters(), 100)
-        self.policy_optimizer.step()
+        if self._target_update_stream is None:
+            ptu.soft_update_params(
+                self._source_params, self._target_params, self.soft_target_tau
+            )
+            return
+        # Read the critics only once their optimizer steps are done.
+        self._target_update_stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(self._target_update_stream):
+            ptu.soft_update_params(
+                self._source_params, self._target_params, self.soft_target_tau
+            )
 
-        self.qf1_optimizer.zero_grad()
-        qf1_loss.backward()
-        norm_qf1 = nn.utils.clip_grad_norm_(self.qf1.parameters(), 100)
-        self.qf1_optimizer.step()
+    def _wait_for_target_update(self):
+        if self._target_update_stream is not None:
+            torch.cuda.current_stream().wait_stream(self._target_update_stream)
 
-        self.qf2_optimizer.zero_grad()
-        qf2_loss.backward()
-        norm_qf2 = nn.utils.clip_grad_norm_(self.qf2.parameters(), 100)
-        self.qf2_optimizer.step()
+    def _update_with_cuda_graph(self, batch):
         """
-        Soft Updates
+        Same as `_update`, but replayed from a CUDA graph once captured.
+
+        The batch is copied into static buffers that the graph reads from.
+        The first steps run eagerly on a side stream to initialize the
+        optimizer state and the cuBLAS workspaces before capturing.
+
+        Not compatible with distributed training: the gradient all-reduce of
+        DistributedDataParallel cannot be captured.
         """
-        if self._n_train_steps_total % self.target_update_period == 0:
-            ptu.soft_update_from_to(self.qf1, self.target_qf1, self.soft_target_tau)
-            ptu.soft_update_from_to(self.qf2, self.target_qf2, self.soft_target_tau)
+        if self._static_batch is None:
+            self._static_batch = {key: batch[key].clone() for key in BATCH_KEYS}
+        else:
+            for key, static_value in self._static_batch.items():
+                static_value.copy_(batch[key], non_blocking=True)
+
+        if self._cuda_graph is None:
+            assert not ptu.distributed and not any(
+                hasattr(net, "module") for net in self.networks
+            ), "CUDA graphs cannot be used with distributed training"
+            if self._n_cuda_graph_warmup_steps < CUDA_GRAPH_WARMUP_STEPS:
+                self._n_cuda_graph_warmup_steps += 1
+                side_stream = torch.cuda.Stream(device=ptu.device)
+                side_stream.wait_stream(torch.cuda.current_stream())
+                with torch.cuda.stream(side_stream):
+                    outputs = self._update(self._static_batch)
+                torch.cuda.current_stream().wait_stream(side_stream)
+                return outputs
+            self._cuda_graph = torch.cuda.CUDAGraph()
+            with torch.cuda.graph(self._cuda_graph):
+                self._static_outputs = self._update(self._static_batch)
+        # Capturing does not run the step, so the first replay follows it.
+        self._cuda_graph.replay()
+        return self._static_outputs
+
+    def _autocast(self):
+        # Network forwards optionally run in bfloat16. The losses, the
+        # entropy terms and the TD target are computed in full precision.
+        return torch.autocast(
+            device_type="cuda" if ptu.gpu_enabled() else "cpu",
+            dtype=torch.bfloat16,
+            enabled=self.use_bf16,
+        )
+
+    def _policy_forward(self, obs, next_obs):
         """
-        Save some statistics for eval
+        Sample actions for obs and next_obs. Pure tensor code, so that it can
+        be compiled.
         """
-        if self._need_to_update_eval_statistics:
-            self._need_to_update_eval_statistics = False
-            """
-            Eval should set this to None.
-            This way, these statistics are only computed for one batch.
-            """
-            policy_loss = (log_pi - q_new_actions).mean()
-
-            self.eval_statistics["QF1 Loss"] = np.mean(ptu.get_numpy(qf1_loss))
-            self.eval_statistics["QF2 Loss"] = np.mean(ptu.get_numpy(qf2_loss))
-            self.eval_statistics["Policy Loss"] = np.mean(ptu.get_numpy(policy_loss))
-            self.eval_statistics["QF1 Grad Norm"] = ptu.get_numpy(norm_qf1)
-            self.eval_statistics["QF2 Grad Norm"] = ptu.get_numpy(norm_qf2)
-            self.eval_statistics["Policy Grad Norm"] = ptu.get_numpy(norm_policy)
-            self.eval_statistics.update(
-                create_stats_ordered_dict("Q1 Predictions", ptu.get_numpy(q1_pred),)
+        with self._autocast():
+            # obs and next_obs go through the policy in a single batched call.
+            # Make sure policy accounts for squashing functions like tanh correctly!
+            policy_outputs = self.policy(
+                torch.cat([obs, next_obs], dim=0),
+                reparameterize=True,
+                return_log_prob=True,
             )
-            self.eval_statistics.update(
-                create_stats_ordered_dict("Q2 Predictions", ptu.get_numpy(q2_pred),)
-            )
-            self.eval_statistics.update(
-                create_stats_ordered_dict("Q1 Predictions", ptu.get_numpy(q1_pred),)
-            )
-            self.eval_statistics.update(
-                create_stats_ordered_dict("Q2 Predictions", ptu.get_numpy(q2_pred),)
-            )
-            self.eval_statistics.update(
-                create_stats_ordered_dict("Q Targets", ptu.get_numpy(q_target),)
-            )
-            self.eval_statistics.update(
-                create_stats_ordered_dict("Log Pis", ptu.get_numpy(log_pi),)
-            )
-            self.eval_statistics.update(
-                create_stats_ordered_dict("Policy mu", ptu.get_numpy(policy_mean),)
-            )
-            self.eval_statistics.update(
-                create_stats_ordered_dict(
-                    "Policy log std", ptu.get_numpy(policy_log_std),
+            (
+                (new_obs_actions, new_next_actions),
+                (policy_mean, _),
+                (policy_log_std, _),
+                (log_pi, new_log_pi),
+            ) = (_split_batch(output) for output in policy_outputs[:4])
+        return (
+            new_obs_actions,
+            new_next_actions,
+            log_pi.float(),
+            new_log_pi.float(),
+            policy_mean,
+            policy_log_std,
+        )
+
+    def _compute_losses(
+        self,
+        obs,
+        actions,
+        rewards,
+        terminals,
+        next_obs,
+        new_obs_actions,
+        new_next_actions,
+        log_pi,
+        new_log_pi,
+        alpha,
+    ):
+        """
+        Policy and critic losses given the sampled actions and the current
+        alpha. Pure tensor code, so that it can be compiled.
+        """
+        with self._autocast():
+            # Only the policy should be trained by the policy loss, so the
+            # critics are evaluated with detached parameters. With twin
+            # critics this shares one forward with the TD predictions.
+            if self.twin_q is not None:
+                (
+                    (q1_new_actions, q2_new_actions),
+                    (q1_pred, q2_pred),
+                ) = self.twin_q.forward_detached_and_live(
+                    obs, new_obs_actions, actions
                 )
-            )
-            self.eval_statistics["Alpha"] = alpha.item()
-            self.eval_statistics["Alpha Loss"] = alpha_loss.item() if self.use_automatic_entropy_tuning else np.nan
-        self._n_train_steps_total += 1
+                q_new_actions = torch.min(q1_new_actions, q2_new_actions)
+            else:
+                q_new_actions = torch.min(
+                    _call_with_detached_params(self.qf1, obs, new_obs_actions),
+                    _call_with_detached_params(self.qf2, obs, new_obs_actions),
+                )
+                q1_pred = self.qf1(obs, actions)
+                q2_pred = self.qf2(obs, actions)
+            # The previous soft update of the targets may still be running
+            # on a side stream; everything above could overlap with it.
+            if not (self.use_torch_compile or self.use_cuda_graph):
+                self._wait_for_target_update()
+            if self.target_twin_q is not None:
+                target_q_values = torch.min(
+                    *self.target_twin_q(next_obs, new_next_actions)
+                )
+            else:
+                target_q_values = torch.min(
+                    self.target_qf1(next_obs, new_next_actions),
+                    self.target_qf2(next_obs, new_next_actions),
+                )
+        q_new_actions = q_new_actions.float()
+        q1_pred = q1_pred.float()
+        q2_pred = q2_pred.float()
+        """
+        Policy Loss
+        """
+        policy_loss = (alpha * log_pi - q_new_actions).mean()
+        """
+        QF Loss
+        """
+        target_q_values = target_q_values.float() - alpha * new_log_pi
+
+        # reward_scale * rewards + (1 - terminals) * discount * target_q_values
+        # with fewer temporaries.
+        discounts = terminals.neg().add_(1.0).mul_(self.discount)
+        q_target = torch.addcmul(
+            rewards * self.reward_scale, discounts, target_q_values
+        )
+        qf1_loss = self.qf_criterion(q1_pred, q_target.detach())
+        qf2_loss = self.qf_criterion(q2_pred, q_target.detach())
+        return (
+            policy_loss,
+            qf1_loss,
+            qf2_loss,
+            q1_pred,
+            q2_pred,
+            q_target,
+            q_new_actions,
+        )
 
     def get_diagnostics(self):
+        if self._pending_stats:
+            self.eval_statistics.update(
+                create_stats_ordered_dict_from_torch(self._pending_stats)
+            )
+            self._pending_stats = {}
         return self.eval_statistics
 
     def end_epoch(self, epoch):
@@ -214,8 +590,47 @@ class SACTrainer(TorchTrainer):
     @networks.setter
     def networks(self, nets):
         self.policy, self.qf1, self.qf2, self.target_qf1, self.target_qf2 = nets
+        self._build_twin_qs()
+        self._cache_target_update_params()
+
+    def _cache_target_update_params(self):
+        # Both critics are soft updated with a single multi-tensor lerp.
+        self._source_params = list(self.qf1.parameters()) + list(
+            self.qf2.parameters()
+        )
+        self._target_params = list(self.target_qf1.parameters()) + list(
+            self.target_qf2.parameters()
+        )
+
+    @property
+    def target_networks(self):
+        return [self.target_qf1, self.target_qf2]
+
+    def _build_twin_qs(self):
+        """
+        Evaluate qf1/qf2 (and their targets) with one batched call when they
+        share an architecture. Networks wrapped for distributed training are
+        called directly so their gradient hooks keep working.
+        """
+        self.twin_q = None
+        self.target_twin_q = None
+        if not self.use_twin_q:
+            return
+        if (
+            not hasattr(self.qf1, "module")
+            and not hasattr(self.qf2, "module")
+            and TwinQ.can_stack(self.qf1, self.qf2)
+        ):
+            self.twin_q = TwinQ(self.qf1, self.qf2)
+        if (
+            not hasattr(self.target_qf1, "module")
+            and not hasattr(self.target_qf2, "module")
+            and TwinQ.can_stack(self.target_qf1, self.target_qf2)
+        ):
+            self.target_twin_q = TwinQ(self.target_qf1, self.target_qf2)
 
     def get_snapshot(self):
+        self._wait_for_target_update()
         snapshot = dict(
             policy=self.policy,
             qf1=self.qf1,
@@ -26,5 +26,9 @@ class SharedBaseTrainer(TorchTrainer):
     def networks(self):
         return self._base_trainer.networks
 
+    @property
+    def target_networks(self):
+        return self._base_trainer.target_networks
+
     def get_snapshot(self):
         return self._base_trainer.get_snapshot()
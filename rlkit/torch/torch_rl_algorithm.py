@@ -5,6 +5,7 @@ from typing import Iterable
 from rlkit.core.batch_rl_algorithm import BatchRLAlgorithm
 from rlkit.core.online_rl_algorithm import OnlineRLAlgorithm
 from rlkit.core.trainer import Trainer
+from rlkit.torch import pytorch_util as ptu
 from rlkit.torch.core import np_to_pytorch_batch
 from torch import nn as nn
 from torch.nn.parallel import DistributedDataParallel as DDP
@@ -12,12 +13,18 @@ from torch.nn.parallel import DistributedDataParallel as DDP
 
 class TorchOnlineRLAlgorithm(OnlineRLAlgorithm):
     def to(self, device, distributed=False):
-        for i, net in enumerate(self.trainer.networks):
+        networks = self.trainer.networks
+        target_networks = self.trainer.target_networks
+        for i, net in enumerate(networks):
             net.to(device)
             if distributed:
-                self.trainer.networks[i] = DDP(
-                    net, device_ids=[device], find_unused_parameters=True
-                )
+                if any(net is target for target in target_networks):
+                    ptu.broadcast_module(net)
+                else:
+                    networks[i] = DDP(
+                        net, device_ids=[device], find_unused_parameters=True
+                    )
+        self.trainer.networks = networks
 
     def training_mode(self, mode):
         for net in self.trainer.networks:
@@ -27,12 +34,16 @@ class TorchOnlineRLAlgorithm(OnlineRLAlgorithm):
 class TorchBatchRLAlgorithm(BatchRLAlgorithm):
     def to(self, device, distributed=False):
         networks = self.trainer.networks
+        target_networks = self.trainer.target_networks
         for i, net in enumerate(networks):
             net.to(device.index)
             if distributed:
-                networks[i] = DDP(
-                    net, device_ids=[device.index], find_unused_parameters=True
-                )
+                if any(net is target for target in target_networks):
+                    ptu.broadcast_module(net)
+                else:
+                    networks[i] = DDP(
+                        net, device_ids=[device.index], find_unused_parameters=True
+                    )
         self.trainer.networks = networks
 
     def training_mode(self, mode):
@@ -65,3 +76,12 @@ class TorchTrainer(Trainer, metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def networks(self) -> Iterable[nn.Module]:
         pass
+
+    @property
+    def target_networks(self) -> Iterable[nn.Module]:
+        """
+        Subset of `networks` that is only updated by copying/averaging
+        parameters. These are not wrapped for distributed training since
+        they never receive gradients.
+        """
+        return []